@@ -4,7 +4,7 @@
 """
    Program name: aadd_playlist_to_mstream.py
    Date Created: 2026/02/16
-   Version:      1.5
+   Version:      1.6
    Author:       Jose Cintron
    E-mail:       l0rddarkf0rce@yahoo.com
 
@@ -20,6 +20,9 @@ python -m mstream_add_playlist -p /path/to/playlist.m3u
 # add every .m3u file in a directory (non-recursive)
 python -m mstream_add_playlist -p /path/to/playlists/
 
+# drop entries that are not found on the local disk before uploading
+python -m mstream_add_playlist -p /path/to/playlists/ --skip-missing
+
 Features
 --------
 * Reads configuration from environment variables **or** a ``.env`` file placed next
@@ -29,24 +32,50 @@ Features
 * Accepts either a single ``.m3u`` file or a directory containing many (non-recursive).
 * All public functions are type-annotated and unit-testable.
 * Logging level can be overridden with the ``PYTHON_LOGGING`` environment variable.
+* Playlists are uploaded concurrently; the number of worker threads can be set
+  with the ``MS_WORKERS`` environment variable.
+* Transient server errors (HTTP 5xx) are retried with back-off (``MS_RETRIES``).
+* Large request bodies are gzip-compressed (``MS_GZIP_MIN_SIZE``).
+* The login is cached on disk (``MS_CACHE_DIR``) and reused for
+  ``MS_SESSION_TTL`` seconds.
 
 Revision History:
    2026/02/16     Original code created
    2026/02/17     Documentation added and code clean up
+   2026/10/14     Upload playlists concurrently (MS_WORKERS threads)
+   2026/10/14     Retry transient 5xx responses (MS_RETRIES)
+   2026/10/14     Serialise/parse JSON with orjson when it is installed
+   2026/10/14     Gzip large request bodies (MS_GZIP_MIN_SIZE)
+   2026/10/14     Reuse the previous login for MS_SESSION_TTL seconds
+   2026/10/14     --skip-missing drops songs that are not found on disk
 """
 
 # --------------------------------------------------------------------------- #
 # Imports
 # --------------------------------------------------------------------------- #
 from __future__ import annotations
+import gzip
+import hashlib
+import json
 import logging
 import os
 import sys
+import time
 from argparse import ArgumentParser, Namespace
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Final, List
+from typing import Any, Final, Iterable, List
+from urllib.parse import urlsplit
+from urllib.request import url2pathname
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:  # optional - C implemented JSON encoder, much faster for large playlists
+    import orjson
+except ImportError:  # pragma: no cover - fall back to the std-lib encoder
+    orjson = None
 
 # --------------------------------------------------------------------------- #
 # Configuration & Logging
@@ -54,12 +83,40 @@ from dotenv import load_dotenv
 # Load a `.env` file if it exists in the same folder as the script.
 load_dotenv(dotenv_path=Path(__file__).with_name(".env"))
 
+# Integer variables that could not be parsed; reported by Settings.validate()
+_invalid_env: List[str] = []
+
+def _env_int(name: str, default: int) -> int:
+    """
+    Return the environment variable *name* as an ``int`` (or *default* when
+    unset).  Unparsable values are recorded so ``Settings.validate()`` can
+    report them instead of silently using the default.
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        _invalid_env.append(f"{name}={value!r}")
+        return default
+
+def _default_cache_dir() -> Path:
+    """Return ``$XDG_CACHE_HOME/mstream_add_playlist`` (``~/.cache`` fallback)."""
+    base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base).expanduser() / "mstream_add_playlist"
+
 # ----- Environment ---------------------------------------------------------- #
 class Settings:
     """Container for all configuration values required by the script."""
     BASE_URL: Final[str] = os.getenv("MS_BASE_URL", "http://127.0.0.1:3000").rstrip("/")
     USERNAME: Final[str] = os.getenv("MS_USERNAME", "admin")
     PASSWORD: Final[str] = os.getenv("MS_PASSWORD", "admin")
+    WORKERS: Final[int] = _env_int("MS_WORKERS", 8)
+    RETRIES: Final[int] = _env_int("MS_RETRIES", 3)
+    GZIP_MIN_SIZE: Final[int] = _env_int("MS_GZIP_MIN_SIZE", 4096)
+    SESSION_TTL: Final[int] = _env_int("MS_SESSION_TTL", 3600)
+    CACHE_DIR: Final[Path] = Path(os.getenv("MS_CACHE_DIR") or _default_cache_dir()).expanduser()
 	
 	# ------------------------------------------------------------------ #
     # Explicit list of keys we care about – easy to extend/maintain
@@ -76,7 +133,18 @@ class Settings:
         ]
         if missing:
             raise RuntimeError(f"Missing configuration for: {', '.join(missing)}")
+        if _invalid_env:
+            raise RuntimeError(f"Not an integer: {', '.join(_invalid_env)}")
+        if cls.WORKERS < 1:
+            raise RuntimeError("MS_WORKERS must be a positive integer")
+        if cls.RETRIES < 0:
+            raise RuntimeError("MS_RETRIES must not be negative")
             
+# The endpoints used by the script never change - build their URLs only once
+LOGIN_URL: Final[str] = f"{Settings.BASE_URL}/api/v1/auth/login"
+SAVE_URL: Final[str] = f"{Settings.BASE_URL}/api/v1/playlist/save"
+PING_URL: Final[str] = f"{Settings.BASE_URL}/api/v1/ping"
+
 # ----- Logging -------------------------------------------------------------- #
 def _setup_logging() -> logging.Logger:
     """
@@ -93,9 +161,25 @@ def _setup_logging() -> logging.Logger:
 
 log = _setup_logging()
 
+# Error responses are truncated to this many bytes when logged
+_MAX_LOGGED_BODY: Final[int] = 512
+
+# Cleared the first time the server refuses a gzip-encoded request body
+_gzip_supported = True
+
 # --------------------------------------------------------------------------- #
 # Helper / Core functions
 # --------------------------------------------------------------------------- #
+def _filter_lines(lines: Iterable[str]) -> List[str]:
+    """
+    Return the stripped, non-empty, non-comment entries of *lines*.
+
+    Kept free of I/O and fully typed so it can be compiled (e.g. with mypyc)
+    without touching the rest of the script.
+    """
+    # Single comprehension; ``line[0]`` avoids a ``startswith`` call per line
+    return [line for line in (raw.strip() for raw in lines) if line and line[0] != "#"]
+
 def parse_m3u(file_path: Path) -> List[str]:
     """
     Read a ``.m3u`` file and return a list of non-comment entries.
@@ -112,14 +196,42 @@ def parse_m3u(file_path: Path) -> List[str]:
     if not file_path.is_file():
         raise FileNotFoundError(f"The file {file_path!s} does not exist")
 
-    songs: List[str] = []
     with file_path.open("r", encoding="utf-8", errors="ignore") as f:
-        for raw_line in f:
-            line = raw_line.strip()
-            if line and not line.startswith("#"):
-                songs.append(line)
+        return _filter_lines(f)
 
-    return songs
+def _song_exists(song: str, base_dir: Path) -> bool:
+    """
+    Return ``True`` for remote stream URLs (``http://`` …) or entries that
+    exist on the local disk.  ``file://`` URIs are checked as local paths.
+    """
+    if "://" in song:
+        parts = urlsplit(song)
+        if parts.scheme.lower() != "file":
+            return True  # remote stream - nothing to check locally
+        return os.path.exists(url2pathname(parts.path))
+    return os.path.exists(os.path.join(base_dir, song))
+
+def drop_missing_songs(songs: List[str], base_dir: Path) -> List[str]:
+    """
+    Return *songs* without the entries that do not exist locally.
+
+    Relative entries are resolved against *base_dir* (the playlist's folder)
+    and ``file://`` URIs are checked like plain paths; remote URLs are kept.
+    The checks run in the calling upload worker, which already runs in
+    parallel with the other playlists.
+
+    Parameters
+    ----------
+    songs
+        Entries returned by :func:`parse_m3u`.
+    base_dir
+        Directory containing the playlist.
+
+    Returns
+    -------
+    List of songs that were found
+    """
+    return [song for song in songs if _song_exists(song, base_dir)]
 
 def gather_m3u_files(root: Path) -> List[Path]:
     """
@@ -145,12 +257,83 @@ def gather_m3u_files(root: Path) -> List[Path]:
     if not root.is_dir():
         raise NotADirectoryError(f"The supplied path {root!s} is neither a file nor a directory")
 
-    # non-recursive glob
-    return sorted(p.resolve() for p in root.glob("*.m3u") if p.is_file())
+    # non-recursive scan; DirEntry caches the type so no extra stat() per entry
+    with os.scandir(root) as it:
+        entries = [
+            Path(e.path) for e in it if e.name.lower().endswith(".m3u") and e.is_file()
+        ]
+    return sorted(p.resolve() for p in entries)
 
-def api_request(session: requests.Session, method: str, endpoint: str, **kwargs) -> requests.Response:
+def build_session() -> requests.Session:
     """
-    Perform an HTTP request against the mStream server.
+    Create a ``requests.Session`` tuned for talking to the mStream server.
+
+    The connection pool is sized to the number of upload workers and transient
+    5xx responses are retried with an exponential back-off.
+
+    Parameters
+    ----------
+    Nothing
+
+    Returns
+    -------
+    requests.Session
+        A new, not yet authenticated, session.
+    """
+    session = requests.Session()
+    session.headers.update(
+        {
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
+        }
+    )
+    retry = Retry(
+        total=Settings.RETRIES,
+        backoff_factor=0.3,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "POST"]),
+        raise_on_status=False,  # let _send() log the final response
+    )
+    adapter = HTTPAdapter(
+        pool_connections=Settings.WORKERS,
+        pool_maxsize=Settings.WORKERS,
+        max_retries=retry,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialise *obj* to compact UTF-8 JSON (uses ``orjson`` when installed)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _json_loads(data: bytes) -> Any:
+    """Deserialise UTF-8 JSON *data* (uses ``orjson`` when installed)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _body_preview(resp: requests.Response) -> str:
+    """Return the first ``_MAX_LOGGED_BODY`` bytes of *resp* decoded for logging."""
+    head = resp.content[:_MAX_LOGGED_BODY]
+    try:
+        return head.decode(resp.encoding or "utf-8", "replace")
+    except LookupError:  # unknown charset announced by the server
+        return head.decode("utf-8", "replace")
+
+def _send(
+    session: requests.Session,
+    method: str,
+    url: str,
+    *,
+    check: bool = True,
+    **kwargs,
+) -> requests.Response:
+    """
+    Send a request to an absolute *url* and raise on non-2xx responses.
 
     Parameters
     ----------
@@ -158,10 +341,13 @@ def api_request(session: requests.Session, method: str, endpoint: str, **kwargs)
         Authenticated `requests.Session`.
     method
         HTTP method (`GET`, `POST` …).
-    endpoint
-        API endpoint (e.g. `/api/v1/playlist/save`). Leading slash is optional.
+    url
+        Fully qualified URL (see ``LOGIN_URL``/``SAVE_URL``).
+    check
+        When ``False`` the response is returned as-is, whatever its status,
+        so the caller can inspect it (see :func:`_check_response`).
     kwargs
-        Passed directly to `Session.request` (usually `json=`).
+        Passed directly to `Session.request` (usually `data=` or `json=`).
 
     Returns
     -------
@@ -171,25 +357,82 @@ def api_request(session: requests.Session, method: str, endpoint: str, **kwargs)
     Raises
     ------
     requests.HTTPError
-        If the response status is not 2xx.
+        If *check* is set and the response status is not 2xx.
     """
-    url = f"{Settings.BASE_URL}/{endpoint.lstrip('/')}"
     resp = session.request(method=method, url=url, timeout=30, **kwargs)
+    return _check_response(resp, method, url) if check else resp
 
+def _check_response(resp: requests.Response, method: str, url: str) -> requests.Response:
+    """Return *resp* if it is 2xx, otherwise log it and raise ``requests.HTTPError``."""
     try:
         resp.raise_for_status()
     except requests.HTTPError:
-        log.exception(
-            "❌ HTTP %s %s → %s: %s",
-            method,
-            endpoint,
-            resp.status_code,
-            resp.text,
-        )
+        # Only decode (the start of) the body when the message will be emitted
+        if log.isEnabledFor(logging.ERROR):
+            log.exception(
+                "❌ HTTP %s %s → %s: %s",
+                method,
+                url,
+                resp.status_code,
+                _body_preview(resp),
+            )
         raise
 
     return resp
 
+def post_json(session: requests.Session, url: str, payload: Any) -> requests.Response:
+    """
+    ``POST`` *payload* as JSON to *url*.
+
+    The body is serialised with :func:`_json_dumps` instead of letting
+    ``requests`` run it through the std-lib encoder.  Bodies of at least
+    ``Settings.GZIP_MIN_SIZE`` bytes are sent gzip-compressed; if the server
+    answers such a request with 415 (Unsupported Media Type) the body is
+    re-sent uncompressed and compression is disabled for the rest of the run.
+
+    Parameters
+    ----------
+    session
+        Authenticated ``requests.Session`` (already sends ``Content-Type: application/json``).
+    url
+        Fully qualified URL (e.g. ``SAVE_URL``).
+    payload
+        Any JSON serialisable object.
+
+    Returns
+    -------
+    requests.Response
+        The successful response object.
+    """
+    global _gzip_supported
+
+    body = _json_dumps(payload)
+    if _gzip_supported and 0 < Settings.GZIP_MIN_SIZE <= len(body):
+        resp = _send(
+            session,
+            "POST",
+            url,
+            check=False,
+            data=gzip.compress(body, compresslevel=6),
+            headers={"Content-Encoding": "gzip"},
+        )
+        # body-parser answers an unsupported Content-Encoding with 415 - retry
+        # quietly and only log if the uncompressed request fails as well
+        if resp.status_code != 415:
+            return _check_response(resp, "POST", url)
+        _gzip_supported = False
+        log.debug("Server refused a gzip request body (415); sending uncompressed.")
+
+    return _send(session, "POST", url, data=body)
+
+def post_login(session: requests.Session, payload: Any) -> requests.Response:
+    """``POST`` *payload* to the (pre-built) login URL."""
+    return post_json(session, LOGIN_URL, payload)
+
+def post_save(session: requests.Session, payload: Any) -> requests.Response:
+    """``POST`` *payload* to the (pre-built) playlist save URL."""
+    return post_json(session, SAVE_URL, payload)
+
 def login(session: requests.Session) -> None:
     """
     Authenticate and store the CSRF token in the session headers.
@@ -204,14 +447,149 @@ def login(session: requests.Session) -> None:
     Nothing
     """
     payload = {"username": Settings.USERNAME, "password": Settings.PASSWORD}
-    resp = api_request(session, "POST", "/api/v1/auth/login", json=payload)
-    data = resp.json()
+    resp = post_login(session, payload)
+    data = _json_loads(resp.content)
     csrf = data.get("token")
     if csrf:
         session.headers.update({"X-CSRF-Token": csrf})
     else:
         log.info("ℹ️ Login succeeded but no CSRF token was returned. Continuing without the X-CSRF-Token header (most API calls accept this).")
     
+def _upload(session: requests.Session, m3u_path: Path, skip_missing: bool = False) -> None:
+    """
+    Parse a single playlist and upload it to the server.
+
+    Any error is logged instead of raised so that one bad file does not
+    cancel the uploads running in the other worker threads.
+
+    Parameters
+    ----------
+    session
+        Authenticated ``requests.Session``.
+    m3u_path
+        Path to the playlist
+    skip_missing
+        Drop entries that do not exist on the local disk before uploading.
+
+    Returns
+    -------
+    Nothing
+    """
+    try:
+        songs = parse_m3u(m3u_path)
+        playlist_name = m3u_path.stem
+        if skip_missing:
+            total = len(songs)
+            songs = drop_missing_songs(songs, m3u_path.parent)
+            if total and not songs:
+                # Saving an empty list would wipe the playlist on the server
+                log.error(
+                    "❌ %s: none of its %d song(s) were found on disk - not uploading.",
+                    playlist_name,
+                    total,
+                )
+                return
+            if len(songs) < total:
+                log.warning(
+                    "⚠️ %s: skipping %d of %d song(s) not found on disk.",
+                    playlist_name,
+                    total - len(songs),
+                    total,
+                )
+        log.info(
+            "▶️ Uploading playlist %s (%d songs)…",
+            playlist_name,
+            len(songs),
+        )
+
+        payload = {"title": playlist_name, "songs": songs}
+        post_save(session, payload)
+
+        log.info("✅ %s uploaded successfully.", playlist_name)
+
+    except Exception as exc:  # noqa: BLE001 - keep processing other files
+        log.error("❌ Failed to add %s: %s", m3u_path.name, exc)
+
+def _session_cache_file() -> Path:
+    """Return the cache file holding the login state for this server/user."""
+    key = f"{Settings.BASE_URL}|{Settings.USERNAME}"
+    return Settings.CACHE_DIR / f"session-{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+def _save_session(session: requests.Session) -> None:
+    """
+    Persist the session cookies and CSRF token so the next run can skip login.
+
+    Parameters
+    ----------
+    session
+        Freshly authenticated ``requests.Session``.
+
+    Returns
+    -------
+    Nothing
+    """
+    if Settings.SESSION_TTL <= 0:
+        return
+
+    state = {
+        "cookies": session.cookies.get_dict(),
+        "csrf": session.headers.get("X-CSRF-Token"),
+        "ts": time.time(),
+    }
+    cache_file = _session_cache_file()
+    tmp_file = cache_file.with_suffix(".tmp")
+    try:
+        Settings.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # The file holds credentials - keep it private to the current user
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as exc:
+        log.debug("Could not write session cache %s: %s", cache_file, exc)
+
+def _restore_session(session: requests.Session) -> bool:
+    """
+    Load a cached login (younger than ``Settings.SESSION_TTL`` seconds) into
+    *session* and verify that the server still accepts it.
+
+    Parameters
+    ----------
+    session
+        Unauthenticated ``requests.Session``.
+
+    Returns
+    -------
+    ``True`` if the cached login is valid, ``False`` if a fresh login is needed.
+    """
+    if Settings.SESSION_TTL <= 0:
+        return False
+
+    try:
+        with _session_cache_file().open("r", encoding="utf-8") as f:
+            state = json.load(f)
+        if time.time() - state["ts"] >= Settings.SESSION_TTL:
+            return False
+        session.cookies.update(state["cookies"])
+        if state["csrf"]:
+            session.headers.update({"X-CSRF-Token": state["csrf"]})
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+
+    # Cheap authenticated call; a 401/403 simply means "log in again"
+    try:
+        resp = _send(session, "GET", PING_URL, check=False)
+    except requests.RequestException as exc:
+        log.debug("Session check failed: %s", exc)
+        resp = None
+
+    if resp is not None and resp.ok:
+        return True
+
+    session.cookies.clear()
+    session.headers.pop("X-CSRF-Token", None)
+    return False
+
 def _parse_cli() -> Namespace:
     """
     Argument parsing.
@@ -234,6 +612,11 @@ def _parse_cli() -> Namespace:
         type=Path,
         help="Path to a .m3u file **or** a directory containing .m3u files (non-recursive).",
     )
+    parser.add_argument(
+        "--skip-missing",
+        action="store_true",
+        help="Drop playlist entries that do not exist on the local disk before uploading.",
+    )
     return parser.parse_args()
 
 def main() -> int:
@@ -262,34 +645,30 @@ def main() -> int:
     log.info("🔎 Found %d .m3u file(s) to process.", len(m3u_files))
 
     # HTTP session + login
-    with requests.Session() as session:
-        session.headers.update(
-            {"Accept": "application/json", "Content-Type": "application/json"}
-        )
+    with build_session() as session:
         try:
-            login(session)
+            if _restore_session(session):
+                log.info("🔑 Reusing cached login.")
+            else:
+                login(session)
+                _save_session(session)
         except Exception as exc:  # noqa: BLE001 - surface any login failure
             log.critical("❌ Login failed: %s", exc)
             return 1
 
-        # Upload each playlist
-        for m3u_path in m3u_files:
-            try:
-                songs = parse_m3u(m3u_path)
-                playlist_name = m3u_path.stem
-                log.info(
-                    "▶️ Uploading playlist %s (%d songs)…",
-                    playlist_name,
-                    len(songs),
-                )
-
-                payload = {"title": playlist_name, "songs": songs}
-                api_request(session, "POST", "/api/v1/playlist/save", json=payload)
-
-                log.info("✅ %s uploaded successfully.", playlist_name)
-
-            except Exception as exc:  # noqa: BLE001 - keep processing other files
-                log.error("❌ Failed to add %s: %s", m3u_path.name, exc)
+        # Upload the playlists concurrently - each upload is independent I/O
+        executor = ThreadPoolExecutor(max_workers=Settings.WORKERS)
+        futures = [executor.submit(_upload, session, p, args.skip_missing) for p in m3u_files]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except KeyboardInterrupt:
+            # Don't let shutdown(wait=True) run every queued upload after Ctrl-C
+            cancelled = sum(future.cancel() for future in futures)
+            executor.shutdown(wait=False)
+            log.warning("⚠️ Interrupted - %d pending upload(s) cancelled.", cancelled)
+            return 130
+        executor.shutdown()
 
     log.info("🎉 All done!")
     return 0